@@ -6,13 +6,110 @@ Rule-Based Expert System using Forward Chaining
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Tuple, List
+from enum import IntEnum
+import functools
+import itertools
+from typing import Callable, Dict, Tuple, List, Optional
 import io
 
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill
 
+try:
+    import numba
+except ImportError:  # batch mode falls back to NumPy masks
+    numba = None
+
+
+class LabelledEnum(IntEnum):
+    """Integer-coded fact value with a lowercase text label"""
+    
+    @functools.cached_property
+    def label(self) -> str:
+        # Lowercased once per member; rules and explanations reuse the cached text
+        return self.name.lower()
+
+
+class OpenLabelledEnum(LabelledEnum):
+    """Labelled fact parsed from free text; subclasses define an OTHER member for unknown labels"""
+    
+    @classmethod
+    def parse(cls, value):
+        """Map a text label (any case) to its member; unknown labels map to OTHER"""
+        if isinstance(value, cls):
+            return value
+        return cls.__members__.get(str(value).upper(), cls.OTHER)
+
+
+class PolicyType(OpenLabelledEnum):
+    COMPREHENSIVE = 0
+    THIRD_PARTY = 1
+    OTHER = 2
+
+
+class LossType(OpenLabelledEnum):
+    # Order matters: ACCIDENT..OWN_DAMAGE are own-vehicle losses, THEFT..FIRE require an FIR
+    ACCIDENT = 0
+    THEFT = 1
+    FIRE = 2
+    OWN_DAMAGE = 3
+    THIRD_PARTY_DAMAGE = 4
+    OTHER = 5
+
+
+class Validity(LabelledEnum):
+    VALID = 0
+    INVALID = 1
+
+
+class Coverage(LabelledEnum):
+    COVERED = 0
+    NOT_COVERED = 1
+
+
+class Decision(LabelledEnum):
+    APPROVED = 0
+    UNDER_INVESTIGATION = 1
+    REJECTED = 2
+
+
+class FraudRisk(LabelledEnum):
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+@dataclass(slots=True)
+class Facts:
+    """Working memory for a single claim evaluation"""
+    policy_type: PolicyType
+    policy_start_date: datetime
+    policy_end_date: datetime
+    loss_date: datetime
+    loss_type: LossType
+    claim_amount: float
+    sum_insured: float
+    deductible: float
+    fir_submitted: bool
+    documents_complete: bool
+    previous_claims: int
+    # Caller's original text, kept for explanations and the trace
+    policy_type_text: str
+    loss_type_text: str
+    claim_validity: Optional[Validity] = None
+    coverage_status: Optional[Coverage] = None
+    claim_decision: Optional[Decision] = None
+    fraud_risk: Optional[FraudRisk] = None
+    payable_amount: float = 0
+    rejection_reason: Optional[str] = None
+
+
+def _label(value: Optional[LabelledEnum]) -> str:
+    return value.label if value is not None else 'unknown'
+
 
 class InsuranceExpertSystem:
     """
@@ -20,292 +117,385 @@ class InsuranceExpertSystem:
     Implements Knowledge Engineering principles with rule-based reasoning
     """
     
-    def __init__(self):
-        self.facts = {}
+    def __init__(self, trace_enabled: bool = True):
+        self.facts: Optional[Facts] = None
         self.inference_trace = []
+        # Batch callers can switch the trace off to skip building its lines; evaluate_claim
+        # then takes the conclusions memoized by _decide instead of running the rule phases
+        self.trace_enabled = trace_enabled
         
     def reset(self):
         """Reset the system for a new evaluation"""
-        self.facts = {}
+        self.facts = None
         self.inference_trace = []
     
     def load_facts(self, input_data: Dict):
         """Load input facts into the knowledge base"""
-        self.facts = input_data.copy()
-        self.inference_trace.append("=== KNOWLEDGE BASE INITIALIZED ===")
-        self.inference_trace.append(f"Input Facts: {list(input_data.keys())}")
+        self.facts = Facts(
+            policy_type=PolicyType.parse(input_data['policy_type']),
+            policy_start_date=input_data['policy_start_date'],
+            policy_end_date=input_data['policy_end_date'],
+            loss_date=input_data['loss_date'],
+            loss_type=LossType.parse(input_data['loss_type']),
+            claim_amount=input_data['claim_amount'],
+            sum_insured=input_data['sum_insured'],
+            deductible=input_data['deductible'],
+            fir_submitted=input_data['fir_submitted'],
+            documents_complete=input_data['documents_complete'],
+            previous_claims=input_data['previous_claims'],
+            policy_type_text=str(input_data['policy_type']),
+            loss_type_text=str(input_data['loss_type']),
+        )
+        if self.trace_enabled:
+            self.inference_trace.append("=== KNOWLEDGE BASE INITIALIZED ===")
+            self.inference_trace.append(f"Input Facts: {list(input_data.keys())}")
     
-    def evaluate_claim(self, input_data: Dict) -> Dict:
+    def evaluate_claim(self, input_data: Dict, generate_explanation: bool = True) -> Dict:
         """
         Main inference engine using forward chaining
-        Applies rules sequentially to derive conclusions
+        Applies rules sequentially to derive conclusions, stopping as soon as
+        a final (non-approval) decision has been reached
+        Without a trace, conclusions are memoized on the categorical facts and
+        only the payable amount is computed per claim
+        With generate_explanation=False the explanation is None
         """
         self.reset()
         self.load_facts(input_data)
         
-        # PHASE 1: Policy Validity Rules
-        self._apply_policy_validity_rules()
-        
-        # PHASE 2: Coverage Rules
-        self._apply_coverage_rules()
-        
-        # PHASE 3: Mandatory Document Rules
-        self._apply_document_rules()
-        
-        # PHASE 4: Fraud Risk Assessment
-        self._apply_fraud_risk_rules()
-        
-        # PHASE 5: Final Decision Rules
-        self._apply_decision_rules()
-        
-        # PHASE 6: Payable Amount Calculation
-        self._calculate_payable_amount()
+        if self.trace_enabled:
+            self._run_rules()
+        else:
+            self._apply_memoized_rules()
         
         # PHASE 7: Generate Explanation
-        explanation = self._generate_explanation()
+        explanation = self._generate_explanation() if generate_explanation else None
         
         return {
-            'claim_validity': self.facts.get('claim_validity', 'unknown'),
-            'coverage_status': self.facts.get('coverage_status', 'unknown'),
-            'claim_decision': self.facts.get('claim_decision', 'unknown'),
-            'payable_amount': self.facts.get('payable_amount', 0),
-            'fraud_risk': self.facts.get('fraud_risk', 'unknown'),
+            'claim_validity': _label(self.facts.claim_validity),
+            'coverage_status': _label(self.facts.coverage_status),
+            'claim_decision': _label(self.facts.claim_decision),
+            'payable_amount': self.facts.payable_amount,
+            'fraud_risk': _label(self.facts.fraud_risk),
             'explanation': explanation,
             'inference_trace': self.inference_trace
         }
     
+    def _run_rules(self):
+        """Forward-chain through the rule phases (PHASES 1-6)"""
+        pipeline = (
+            self._apply_policy_validity_rules,   # PHASE 1: Policy Validity Rules
+            self._apply_coverage_rules,          # PHASE 2: Coverage Rules
+            self._apply_fraud_risk_rules,        # PHASE 3: Fraud Risk Assessment
+            self._apply_document_rules,          # PHASE 4: Mandatory Document Rules
+            self._apply_decision_rules,          # PHASE 5: Final Decision Rules
+            self._calculate_payable_amount,      # PHASE 6: Payable Amount Calculation
+        )
+        for phase in pipeline:
+            phase()
+            if self._terminal():
+                if self.trace_enabled:
+                    self.inference_trace.append(
+                        f"\nCONCLUSION: claim_decision = {self.facts.claim_decision.name} → remaining rules skipped"
+                    )
+                break
+    
+    def _apply_memoized_rules(self):
+        """Take the conclusions for these categorical facts from _decide, then price the claim"""
+        facts = self.facts
+        valid = not (facts.loss_date < facts.policy_start_date or facts.loss_date > facts.policy_end_date)
+        (facts.claim_decision, facts.fraud_risk, facts.claim_validity,
+         facts.coverage_status, facts.rejection_reason) = _decide(
+            facts.policy_type, facts.loss_type, bool(facts.fir_submitted), bool(facts.documents_complete),
+            valid, min(max(facts.previous_claims - 1, 0), 2)
+        )
+        if facts.claim_decision == Decision.APPROVED:
+            self._calculate_payable_amount()
+    
+    def _terminal(self) -> bool:
+        """A rejection or investigation is final; payable amount stays 0"""
+        return self.facts.claim_decision in (Decision.REJECTED, Decision.UNDER_INVESTIGATION)
+    
     def _apply_policy_validity_rules(self):
         """Rule 1: Check if loss occurred within policy period"""
-        self.inference_trace.append("\n--- APPLYING POLICY VALIDITY RULES ---")
+        if self.trace_enabled:
+            self.inference_trace.append("\n--- APPLYING POLICY VALIDITY RULES ---")
         
-        loss_date = self.facts['loss_date']
-        policy_start = self.facts['policy_start_date']
-        policy_end = self.facts['policy_end_date']
+        loss_date = self.facts.loss_date
+        policy_start = self.facts.policy_start_date
+        policy_end = self.facts.policy_end_date
         
         if loss_date < policy_start:
-            self.facts['claim_validity'] = 'invalid'
-            self.inference_trace.append(
-                f"RULE FIRED: Loss date ({loss_date}) before policy start ({policy_start}) → claim_validity = INVALID"
-            )
+            self.facts.claim_validity = Validity.INVALID
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Loss date ({loss_date}) before policy start ({policy_start}) → claim_validity = INVALID"
+                )
         elif loss_date > policy_end:
-            self.facts['claim_validity'] = 'invalid'
-            self.inference_trace.append(
-                f"RULE FIRED: Loss date ({loss_date}) after policy end ({policy_end}) → claim_validity = INVALID"
-            )
+            self.facts.claim_validity = Validity.INVALID
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Loss date ({loss_date}) after policy end ({policy_end}) → claim_validity = INVALID"
+                )
         else:
-            self.facts['claim_validity'] = 'valid'
-            self.inference_trace.append(
-                f"RULE FIRED: Loss date within policy period → claim_validity = VALID"
-            )
+            self.facts.claim_validity = Validity.VALID
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Loss date within policy period → claim_validity = VALID"
+                )
     
     def _apply_coverage_rules(self):
         """Rule 2 & 3: Check if loss type is covered under policy type"""
-        self.inference_trace.append("\n--- APPLYING COVERAGE RULES ---")
+        if self.trace_enabled:
+            self.inference_trace.append("\n--- APPLYING COVERAGE RULES ---")
         
-        policy_type = self.facts['policy_type'].lower()
-        loss_type = self.facts['loss_type'].lower()
+        policy_type = self.facts.policy_type
+        loss_type = self.facts.loss_type
         
         # Rule: Third party policies don't cover own damage
-        if policy_type == 'third_party' and loss_type == 'own_damage':
-            self.facts['coverage_status'] = 'not_covered'
-            self.inference_trace.append(
-                f"RULE FIRED: Third-party policy does not cover own damage → coverage_status = NOT COVERED"
-            )
+        if policy_type == PolicyType.THIRD_PARTY and loss_type == LossType.OWN_DAMAGE:
+            self.facts.coverage_status = Coverage.NOT_COVERED
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Third-party policy does not cover own damage → coverage_status = NOT COVERED"
+                )
         
         # Rule: Comprehensive policies cover accident, theft, fire
-        elif policy_type == 'comprehensive' and loss_type in ['accident', 'theft', 'fire', 'own_damage']:
-            self.facts['coverage_status'] = 'covered'
-            self.inference_trace.append(
-                f"RULE FIRED: Comprehensive policy covers {loss_type} → coverage_status = COVERED"
-            )
+        elif policy_type == PolicyType.COMPREHENSIVE and loss_type <= LossType.OWN_DAMAGE:
+            self.facts.coverage_status = Coverage.COVERED
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Comprehensive policy covers {self.facts.loss_type_text.lower()} → coverage_status = COVERED"
+                )
         
         # Rule: Third party damage covered by both policy types
-        elif loss_type == 'third_party_damage':
-            self.facts['coverage_status'] = 'covered'
-            self.inference_trace.append(
-                f"RULE FIRED: Third-party damage is covered → coverage_status = COVERED"
-            )
+        elif loss_type == LossType.THIRD_PARTY_DAMAGE:
+            self.facts.coverage_status = Coverage.COVERED
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Third-party damage is covered → coverage_status = COVERED"
+                )
         
         else:
-            self.facts['coverage_status'] = 'not_covered'
-            self.inference_trace.append(
-                f"RULE FIRED: {loss_type} not covered under {policy_type} → coverage_status = NOT COVERED"
-            )
+            self.facts.coverage_status = Coverage.NOT_COVERED
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: {self.facts.loss_type_text.lower()} not covered under "
+                    f"{self.facts.policy_type_text.lower()} → coverage_status = NOT COVERED"
+                )
     
     def _apply_document_rules(self):
         """Rule 4 & 5: Check mandatory documentation requirements"""
-        self.inference_trace.append("\n--- APPLYING DOCUMENT RULES ---")
+        if self.trace_enabled:
+            self.inference_trace.append("\n--- APPLYING DOCUMENT RULES ---")
         
-        loss_type = self.facts['loss_type'].lower()
-        fir_submitted = self.facts['fir_submitted']
-        documents_complete = self.facts['documents_complete']
+        loss_type = self.facts.loss_type
+        fir_submitted = self.facts.fir_submitted
+        documents_complete = self.facts.documents_complete
         
         # Rule: FIR mandatory for theft and fire
-        if loss_type in ['theft', 'fire'] and not fir_submitted:
-            self.facts['claim_decision'] = 'rejected'
-            self.facts['rejection_reason'] = 'FIR not submitted for theft/fire case'
-            self.inference_trace.append(
-                f"RULE FIRED: {loss_type.upper()} requires FIR, but not submitted → claim_decision = REJECTED"
-            )
+        if LossType.THEFT <= loss_type <= LossType.FIRE and not fir_submitted:
+            self.facts.claim_decision = Decision.REJECTED
+            self.facts.rejection_reason = 'FIR not submitted for theft/fire case'
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: {self.facts.loss_type_text.upper()} requires FIR, but not submitted → claim_decision = REJECTED"
+                )
         
         # Rule: All documents must be complete
         elif not documents_complete:
-            self.facts['claim_decision'] = 'rejected'
-            self.facts['rejection_reason'] = 'Incomplete documentation'
-            self.inference_trace.append(
-                f"RULE FIRED: Documents incomplete → claim_decision = REJECTED"
-            )
+            self.facts.claim_decision = Decision.REJECTED
+            self.facts.rejection_reason = 'Incomplete documentation'
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Documents incomplete → claim_decision = REJECTED"
+                )
         
         else:
-            self.inference_trace.append(
-                f"RULE PASSED: All mandatory documents submitted"
-            )
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE PASSED: All mandatory documents submitted"
+                )
     
     def _apply_fraud_risk_rules(self):
         """Rule 7: Assess fraud risk based on previous claims"""
-        self.inference_trace.append("\n--- APPLYING FRAUD RISK RULES ---")
+        if self.trace_enabled:
+            self.inference_trace.append("\n--- APPLYING FRAUD RISK RULES ---")
         
-        previous_claims = self.facts['previous_claims']
+        previous_claims = self.facts.previous_claims
         
         if previous_claims >= 3:
-            self.facts['fraud_risk'] = 'high'
-            self.inference_trace.append(
-                f"RULE FIRED: {previous_claims} previous claims (≥3) → fraud_risk = HIGH"
-            )
+            self.facts.fraud_risk = FraudRisk.HIGH
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: {previous_claims} previous claims (≥3) → fraud_risk = HIGH"
+                )
         elif previous_claims == 2:
-            self.facts['fraud_risk'] = 'medium'
-            self.inference_trace.append(
-                f"RULE FIRED: {previous_claims} previous claims (=2) → fraud_risk = MEDIUM"
-            )
+            self.facts.fraud_risk = FraudRisk.MEDIUM
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: {previous_claims} previous claims (=2) → fraud_risk = MEDIUM"
+                )
         else:
-            self.facts['fraud_risk'] = 'low'
-            self.inference_trace.append(
-                f"RULE FIRED: {previous_claims} previous claim(s) (≤1) → fraud_risk = LOW"
-            )
+            self.facts.fraud_risk = FraudRisk.LOW
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: {previous_claims} previous claim(s) (≤1) → fraud_risk = LOW"
+                )
     
     def _apply_decision_rules(self):
         """Rule 6 & 8: Make final claim decision"""
-        self.inference_trace.append("\n--- APPLYING FINAL DECISION RULES ---")
+        if self.trace_enabled:
+            self.inference_trace.append("\n--- APPLYING FINAL DECISION RULES ---")
         
-        # If already rejected, skip
-        if self.facts.get('claim_decision') == 'rejected':
-            self.inference_trace.append("RULE: Claim already rejected, no further evaluation needed")
-            return
-        
-        claim_validity = self.facts.get('claim_validity')
-        coverage_status = self.facts.get('coverage_status')
-        fraud_risk = self.facts.get('fraud_risk')
+        claim_validity = self.facts.claim_validity
+        coverage_status = self.facts.coverage_status
+        fraud_risk = self.facts.fraud_risk
         
         # Rule: High fraud risk requires investigation
-        if fraud_risk == 'high':
-            self.facts['claim_decision'] = 'under_investigation'
-            self.inference_trace.append(
-                f"RULE FIRED: High fraud risk → claim_decision = UNDER INVESTIGATION"
-            )
+        if fraud_risk == FraudRisk.HIGH:
+            self.facts.claim_decision = Decision.UNDER_INVESTIGATION
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: High fraud risk → claim_decision = UNDER INVESTIGATION"
+                )
         
         # Rule: Invalid claim or not covered = rejected
-        elif claim_validity == 'invalid':
-            self.facts['claim_decision'] = 'rejected'
-            self.facts['rejection_reason'] = 'Claim outside policy period'
-            self.inference_trace.append(
-                f"RULE FIRED: Invalid claim → claim_decision = REJECTED"
-            )
+        elif claim_validity == Validity.INVALID:
+            self.facts.claim_decision = Decision.REJECTED
+            self.facts.rejection_reason = 'Claim outside policy period'
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Invalid claim → claim_decision = REJECTED"
+                )
         
-        elif coverage_status == 'not_covered':
-            self.facts['claim_decision'] = 'rejected'
-            self.facts['rejection_reason'] = 'Loss type not covered under policy'
-            self.inference_trace.append(
-                f"RULE FIRED: Not covered → claim_decision = REJECTED"
-            )
+        elif coverage_status == Coverage.NOT_COVERED:
+            self.facts.claim_decision = Decision.REJECTED
+            self.facts.rejection_reason = 'Loss type not covered under policy'
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Not covered → claim_decision = REJECTED"
+                )
         
         # Rule: All conditions met = approved
-        elif claim_validity == 'valid' and coverage_status == 'covered':
-            self.facts['claim_decision'] = 'approved'
-            self.inference_trace.append(
-                f"RULE FIRED: Valid claim + Covered loss + Documents OK → claim_decision = APPROVED"
-            )
+        elif claim_validity == Validity.VALID and coverage_status == Coverage.COVERED:
+            self.facts.claim_decision = Decision.APPROVED
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Valid claim + Covered loss + Documents OK → claim_decision = APPROVED"
+                )
         
         else:
-            self.facts['claim_decision'] = 'rejected'
-            self.facts['rejection_reason'] = 'Does not meet approval criteria'
-            self.inference_trace.append(
-                f"RULE FIRED: Default rejection → claim_decision = REJECTED"
-            )
+            self.facts.claim_decision = Decision.REJECTED
+            self.facts.rejection_reason = 'Does not meet approval criteria'
+            if self.trace_enabled:
+                self.inference_trace.append(
+                    f"RULE FIRED: Default rejection → claim_decision = REJECTED"
+                )
     
     def _calculate_payable_amount(self):
         """Rule 6: Calculate payable amount if approved"""
-        self.inference_trace.append("\n--- CALCULATING PAYABLE AMOUNT ---")
+        if self.trace_enabled:
+            self.inference_trace.append("\n--- CALCULATING PAYABLE AMOUNT ---")
         
-        decision = self.facts.get('claim_decision')
+        decision = self.facts.claim_decision
         
-        if decision != 'approved':
-            self.facts['payable_amount'] = 0
-            self.inference_trace.append(f"Claim not approved → payable_amount = 0")
+        if decision != Decision.APPROVED:
+            self.facts.payable_amount = 0
+            if self.trace_enabled:
+                self.inference_trace.append(f"Claim not approved → payable_amount = 0")
             return
         
-        claim_amount = self.facts['claim_amount']
-        sum_insured = self.facts['sum_insured']
-        deductible = self.facts['deductible']
+        claim_amount = self.facts.claim_amount
+        sum_insured = self.facts.sum_insured
+        deductible = self.facts.deductible
         
         # Admissible loss = minimum of claim amount and sum insured
         admissible_loss = min(claim_amount, sum_insured)
-        self.inference_trace.append(
-            f"Admissible Loss = MIN(claim_amount: {claim_amount}, sum_insured: {sum_insured}) = {admissible_loss}"
-        )
+        if self.trace_enabled:
+            self.inference_trace.append(
+                f"Admissible Loss = MIN(claim_amount: {claim_amount}, sum_insured: {sum_insured}) = {admissible_loss}"
+            )
         
         # Payable amount = admissible loss - deductible
         payable_amount = max(0, admissible_loss - deductible)
-        self.facts['payable_amount'] = payable_amount
-        self.inference_trace.append(
-            f"Payable Amount = {admissible_loss} - {deductible} (deductible) = {payable_amount}"
-        )
+        self.facts.payable_amount = payable_amount
+        if self.trace_enabled:
+            self.inference_trace.append(
+                f"Payable Amount = {admissible_loss} - {deductible} (deductible) = {payable_amount}"
+            )
     
     def _generate_explanation(self) -> str:
         """Generate natural language explanation of the decision"""
-        decision = self.facts.get('claim_decision')
-        
-        if decision == 'approved':
-            explanation = (
-                f"✅ CLAIM APPROVED: The claim is approved because the policy was active on the date of loss "
-                f"({self.facts['loss_date']}), the incident type ({self.facts['loss_type']}) is covered under "
-                f"the {self.facts['policy_type']} policy, and all mandatory documents were submitted. "
-                f"The payable amount of ₹{self.facts['payable_amount']:,.2f} was calculated after applying "
-                f"the deductible of ₹{self.facts['deductible']:,.2f}. "
-            )
-            if self.facts['fraud_risk'] == 'medium':
-                explanation += "Note: Medium fraud risk detected due to previous claims history."
-        
-        elif decision == 'rejected':
-            reason = self.facts.get('rejection_reason', 'Unknown reason')
-            explanation = (
-                f"❌ CLAIM REJECTED: The claim is rejected because {reason.lower()}. "
-            )
-            if self.facts.get('claim_validity') == 'invalid':
-                explanation += (
-                    f"The loss date ({self.facts['loss_date']}) falls outside the policy period "
-                    f"({self.facts['policy_start_date']} to {self.facts['policy_end_date']}). "
-                )
-            elif self.facts.get('coverage_status') == 'not_covered':
-                explanation += (
-                    f"The policy type ({self.facts['policy_type']}) does not cover {self.facts['loss_type']}. "
-                )
-        
-        elif decision == 'under_investigation':
-            explanation = (
-                f"🔍 UNDER INVESTIGATION: The claim is marked for investigation due to high fraud risk. "
-                f"The claimant has {self.facts['previous_claims']} previous claims in the last year, "
-                f"which exceeds the acceptable threshold. A detailed investigation will be conducted before "
-                f"making a final decision. "
-            )
-        
-        else:
-            explanation = "Unable to determine claim status. Please review input data."
-        
-        return explanation
+        facts = self.facts
+        return build_explanation({
+            'policy_type': facts.policy_type_text,
+            'loss_type': facts.loss_type_text,
+            'policy_start_date': facts.policy_start_date,
+            'policy_end_date': facts.policy_end_date,
+            'loss_date': facts.loss_date,
+            'deductible': facts.deductible,
+            'previous_claims': facts.previous_claims,
+            'claim_validity': _label(facts.claim_validity),
+            'coverage_status': _label(facts.coverage_status),
+            'claim_decision': _label(facts.claim_decision),
+            'payable_amount': facts.payable_amount,
+            'fraud_risk': _label(facts.fraud_risk),
+            'rejection_reason': facts.rejection_reason or 'Unknown reason',
+        })
+
+
+# Explanation templates, filled from a facts mapping with str.format_map
+_APPROVED_TMPL = (
+    "✅ CLAIM APPROVED: The claim is approved because the policy was active on the date of loss "
+    "({loss_date}), the incident type ({loss_type}) is covered under "
+    "the {policy_type} policy, and all mandatory documents were submitted. "
+    "The payable amount of ₹{payable_amount:,.2f} was calculated after applying "
+    "the deductible of ₹{deductible:,.2f}. "
+)
+_MEDIUM_RISK_NOTE = "Note: Medium fraud risk detected due to previous claims history."
+_REJECTED_TMPL = "❌ CLAIM REJECTED: The claim is rejected because {reason}. "
+_OUTSIDE_PERIOD_TMPL = (
+    "The loss date ({loss_date}) falls outside the policy period "
+    "({policy_start_date} to {policy_end_date}). "
+)
+_NOT_COVERED_TMPL = "The policy type ({policy_type}) does not cover {loss_type}. "
+_INVESTIGATION_TMPL = (
+    "🔍 UNDER INVESTIGATION: The claim is marked for investigation due to high fraud risk. "
+    "The claimant has {previous_claims} previous claims in the last year, "
+    "which exceeds the acceptable threshold. A detailed investigation will be conducted before "
+    "making a final decision. "
+)
+_UNDETERMINED_TEXT = "Unable to determine claim status. Please review input data."
 
 
-def parse_date(date_input) -> datetime:
-    return pd.to_datetime(date_input, dayfirst=True).to_pydatetime()
+def build_explanation(facts: Dict) -> str:
+    """Natural language explanation for a set of evaluated facts"""
+    decision = facts.get('claim_decision')
+    
+    if decision == 'approved':
+        explanation = _APPROVED_TMPL.format_map(facts)
+        if facts['fraud_risk'] == 'medium':
+            explanation += _MEDIUM_RISK_NOTE
+    
+    elif decision == 'rejected':
+        reason = facts.get('rejection_reason', 'Unknown reason')
+        explanation = _REJECTED_TMPL.format(reason=reason.lower())
+        if facts.get('claim_validity') == 'invalid':
+            explanation += _OUTSIDE_PERIOD_TMPL.format_map(facts)
+        elif facts.get('coverage_status') == 'not_covered':
+            explanation += _NOT_COVERED_TMPL.format_map(facts)
+    
+    elif decision == 'under_investigation':
+        explanation = _INVESTIGATION_TMPL.format_map(facts)
+    
+    else:
+        explanation = _UNDETERMINED_TEXT
+    
+    return explanation
+
+
+# Text values accepted as "yes" for boolean inputs
+_TRUE_SET = frozenset(('yes', 'true', '1', 'y', 't'))
 
 
 def parse_boolean(bool_input) -> bool:
@@ -313,50 +503,282 @@ def parse_boolean(bool_input) -> bool:
     if isinstance(bool_input, bool):
         return bool_input
     if isinstance(bool_input, str):
-        return bool_input.lower() in ['yes', 'true', '1', 'y']
+        return bool_input.lower() in _TRUE_SET
     return bool(bool_input)
 
 
-def process_csv(uploaded_file) -> pd.DataFrame:
-    """Process uploaded CSV file and evaluate all claims"""
-    # Read CSV
-    df = pd.read_csv(uploaded_file)
-    
-    # Initialize expert system
-    expert_system = InsuranceExpertSystem()
-    
-    # Prepare output columns
-    results = []
-    
-    for idx, row in df.iterrows():
-        # Prepare input data
-        input_data = {
-            'policy_type': str(row['policy_type']),
-            'policy_start_date': parse_date(row['policy_start_date']),
-            'policy_end_date': parse_date(row['policy_end_date']),
-            'loss_date': parse_date(row['loss_date']),
-            'loss_type': str(row['loss_type']),
-            'claim_amount': float(row['claim_amount']),
-            'sum_insured': float(row['sum_insured']),
-            'deductible': float(row['deductible']),
-            'fir_submitted': parse_boolean(row['fir_submitted']),
-            'documents_complete': parse_boolean(row['documents_complete']),
-            'previous_claims': int(row['previous_claims'])
-        }
+# Integer encodings used by the batch evaluators (unknown labels map to OTHER)
+POLICY_TYPE_CODES = {member.label: member.value for member in PolicyType}
+LOSS_TYPE_CODES = {member.label: member.value for member in LossType}
+
+# Batch decision codes; rejections carry their reason in the code
+APPROVED = 0
+UNDER_INVESTIGATION = 1
+REJECTED_NO_FIR = 2
+REJECTED_DOCUMENTS = 3
+REJECTED_INVALID = 4
+REJECTED_NOT_COVERED = 5
+
+DECISION_LABELS = np.array([
+    Decision.APPROVED.label, Decision.UNDER_INVESTIGATION.label,
+    Decision.REJECTED.label, Decision.REJECTED.label, Decision.REJECTED.label, Decision.REJECTED.label,
+])
+REJECTION_REASONS = np.array([
+    '', '',
+    'FIR not submitted for theft/fire case',
+    'Incomplete documentation',
+    'Claim outside policy period',
+    'Loss type not covered under policy',
+])
+VALIDITY_LABELS = np.array([member.label for member in Validity])
+COVERAGE_LABELS = np.array([member.label for member in Coverage])
+FRAUD_RISK_LABELS = np.array([member.label for member in FraudRisk])
+
+# Bit layout of a decision-table key:
+#   policy_type (2 bits) | loss_type (3) | fir (1) | docs (1) | valid (1) | previous-claims bucket (2)
+# Previous-claims buckets follow the fraud rules: 0 = at most 1, 1 = exactly 2, 2 = 3 or more
+_LOSS_SHIFT = 2
+_FIR_SHIFT = 5
+_DOCS_SHIFT = 6
+_VALID_SHIFT = 7
+_PREV_SHIFT = 8
+_DECISION_TABLE_SIZE = 1 << 10
+
+
+@functools.lru_cache(maxsize=None)  # at most 3 x 6 x 2 x 2 x 2 x 3 = 432 entries
+def _decide(policy_type: PolicyType, loss_type: LossType, fir: bool, docs: bool,
+            valid: bool, prev_claims_bucket: int) -> Tuple:
+    """
+    Conclusions of the rule base for one combination of categorical facts
+    Previous-claims buckets follow the fraud rules: 0 = at most 1, 1 = exactly 2, 2 = 3 or more
+    Returns (decision, fraud_risk, validity, coverage, rejection_reason)
+    """
+    expert_system = InsuranceExpertSystem(trace_enabled=False)
+    expert_system.load_facts({
+        'policy_type': policy_type.label,
+        'policy_start_date': datetime(2000, 1, 1),
+        'policy_end_date': datetime(2000, 12, 31),
+        'loss_date': datetime(2000, 6, 1) if valid else datetime(2001, 6, 1),
+        'loss_type': loss_type.label,
+        'claim_amount': 0.0,
+        'sum_insured': 0.0,
+        'deductible': 0.0,
+        'fir_submitted': fir,
+        'documents_complete': docs,
+        'previous_claims': prev_claims_bucket + 1,
+    })
+    expert_system._run_rules()
+    facts = expert_system.facts
+    return facts.claim_decision, facts.fraud_risk, facts.claim_validity, facts.coverage_status, facts.rejection_reason
+
+
+def _build_decision_table() -> np.ndarray:
+    """
+    Materialize the rule base as a lookup table from the conclusions of the
+    inference engine for every combination of categorical facts
+    Each row holds (decision code, fraud risk, validity, coverage)
+    """
+    # Keys the encoders cannot produce must never read as an approval, so pre-fill with a rejection
+    table = np.empty((_DECISION_TABLE_SIZE, 4), dtype=np.int8)
+    table[:] = (REJECTED_NOT_COVERED, FraudRisk.HIGH, Validity.INVALID, Coverage.NOT_COVERED)
+    
+    for policy_type, loss_type, fir, docs, valid, prev_bucket in itertools.product(
+            PolicyType, LossType, (False, True), (False, True), (False, True), range(3)):
+        decision, fraud_risk, validity, coverage, rejection_reason = _decide(
+            policy_type, loss_type, fir, docs, valid, prev_bucket
+        )
+        if decision == Decision.REJECTED:
+            decision_code = list(REJECTION_REASONS).index(rejection_reason)
+        elif decision == Decision.UNDER_INVESTIGATION:
+            decision_code = UNDER_INVESTIGATION
+        else:
+            decision_code = APPROVED
+        
+        key = (policy_type | loss_type << _LOSS_SHIFT | fir << _FIR_SHIFT | docs << _DOCS_SHIFT
+               | valid << _VALID_SHIFT | prev_bucket << _PREV_SHIFT)
+        table[key] = (decision_code, fraud_risk, validity, coverage)
+    
+    return table
+
+
+DECISION_TABLE = _build_decision_table()
+
+
+def _evaluate_batch_kernel(policy_type_codes, loss_type_codes, start_ts, end_ts, loss_ts,
+                           claim_amt, sum_ins, deductible, fir, docs, prev_claims):
+    """
+    Row-by-row decision-table lookup over encoded claim arrays (compiled with Numba)
+    Compiled serially: Streamlit runs the script off the main thread, where parallel
+    threading layers such as TBB can hang the interpreter on exit
+    """
+    n = loss_ts.shape[0]
+    decision_code = np.empty(n, np.int8)
+    payable = np.zeros(n, np.float64)
+    fraud_code = np.empty(n, np.int8)
+    validity_code = np.empty(n, np.int8)
+    coverage_code = np.empty(n, np.int8)
+    
+    for i in range(n):
+        valid = not (loss_ts[i] < start_ts[i] or loss_ts[i] > end_ts[i])
+        prev_bucket = min(max(prev_claims[i] - 1, 0), 2)
+        key = (policy_type_codes[i] | loss_type_codes[i] << _LOSS_SHIFT | fir[i] << _FIR_SHIFT
+               | docs[i] << _DOCS_SHIFT | valid << _VALID_SHIFT | prev_bucket << _PREV_SHIFT)
+        
+        decision_code[i] = DECISION_TABLE[key, 0]
+        fraud_code[i] = DECISION_TABLE[key, 1]
+        validity_code[i] = DECISION_TABLE[key, 2]
+        coverage_code[i] = DECISION_TABLE[key, 3]
         
-        # Evaluate claim
-        result = expert_system.evaluate_claim(input_data)
-        results.append(result)
+        if decision_code[i] == APPROVED:
+            payable[i] = max(0.0, min(claim_amt[i], sum_ins[i]) - deductible[i])
+    
+    return decision_code, payable, fraud_code, validity_code, coverage_code
+
+
+if numba is not None:
+    evaluate_batch_numba = numba.njit(cache=True)(_evaluate_batch_kernel)
+else:
+    evaluate_batch_numba = None
+
+
+def _evaluate_batch_numpy(policy_type_codes, loss_type_codes, start_ts, end_ts, loss_ts,
+                          claim_amt, sum_ins, deductible, fir, docs, prev_claims):
+    """Same decision-table lookup as the Numba kernel, as one NumPy fancy-index"""
+    valid = ~((loss_ts < start_ts) | (loss_ts > end_ts))
+    prev_bucket = np.clip(prev_claims - 1, 0, 2)
+    key = (
+        policy_type_codes.astype(np.intp)
+        | loss_type_codes.astype(np.intp) << _LOSS_SHIFT
+        | fir.astype(np.intp) << _FIR_SHIFT
+        | docs.astype(np.intp) << _DOCS_SHIFT
+        | valid.astype(np.intp) << _VALID_SHIFT
+        | prev_bucket.astype(np.intp) << _PREV_SHIFT
+    )
+    decision_code, fraud_code, validity_code, coverage_code = DECISION_TABLE[key].T
     
-    # Add results to dataframe
-    df['claim_validity'] = [r['claim_validity'] for r in results]
-    df['coverage_status'] = [r['coverage_status'] for r in results]
-    df['claim_decision'] = [r['claim_decision'] for r in results]
-    df['payable_amount'] = [r['payable_amount'] for r in results]
-    df['fraud_risk'] = [r['fraud_risk'] for r in results]
-    df['explanation'] = [r['explanation'] for r in results]
+    # Payable amount calculation, with the kernel's min/max semantics for blank (NaN) amounts:
+    # min(claim, nan) keeps the claim amount and max(0.0, nan) is 0
+    admissible_loss = np.where(sum_ins < claim_amt, sum_ins, claim_amt)
+    payable = np.where(
+        decision_code == APPROVED,
+        np.fmax(admissible_loss - deductible, 0.0),
+        0.0
+    )
     
-    return df
+    return decision_code, payable, fraud_code, validity_code, coverage_code
+
+
+DATE_COLUMNS = ['policy_start_date', 'policy_end_date', 'loss_date']
+CSV_DTYPES = {
+    'policy_type': 'category',
+    'loss_type': 'category',
+    'claim_amount': 'float64',
+    'sum_insured': 'float64',
+    'deductible': 'float64',
+    'previous_claims': 'int32',
+    'fir_submitted': 'string',
+    'documents_complete': 'string',
+}
+
+
+def _encode_labels(column: pd.Series, codes: Dict[str, int], other: int) -> np.ndarray:
+    """Map a categorical label column to integer codes with one lookup per category"""
+    category_codes = column.cat.categories.astype(str).str.lower().map(codes).fillna(other)
+    # Missing values have category code -1, which indexes the trailing OTHER entry
+    lookup = np.append(category_codes.to_numpy(np.int8), np.int8(other))
+    return lookup[column.cat.codes.to_numpy()]
+
+
+def _timestamps(column: pd.Series) -> np.ndarray:
+    """Dates as int64 seconds, so validity checks are plain integer compares"""
+    # Second resolution covers every datetime64 date (nanoseconds overflow past 2262)
+    return column.to_numpy(dtype='datetime64[s]').view(np.int64)
+
+
+def _evaluate_chunk(df: pd.DataFrame, generate_explanations: bool = True) -> pd.DataFrame:
+    """
+    Evaluate every claim in a typed DataFrame
+    Columns are encoded to NumPy arrays once and evaluated in a single batch
+    (Numba-compiled when available, vectorized NumPy otherwise)
+    """
+    # Encode input columns (one vectorized pass per column)
+    columns = (
+        _encode_labels(df['policy_type'], POLICY_TYPE_CODES, PolicyType.OTHER),
+        _encode_labels(df['loss_type'], LOSS_TYPE_CODES, LossType.OTHER),
+        _timestamps(df['policy_start_date']),
+        _timestamps(df['policy_end_date']),
+        _timestamps(df['loss_date']),
+        df['claim_amount'].to_numpy(np.float64),
+        df['sum_insured'].to_numpy(np.float64),
+        df['deductible'].to_numpy(np.float64),
+        df['fir_submitted'].str.lower().isin(_TRUE_SET).to_numpy(bool),
+        df['documents_complete'].str.lower().isin(_TRUE_SET).to_numpy(bool),
+        df['previous_claims'].to_numpy(np.int64),
+    )
+    
+    evaluate_batch = evaluate_batch_numba if evaluate_batch_numba is not None else _evaluate_batch_numpy
+    decision_code, payable, fraud_code, validity_code, coverage_code = evaluate_batch(*columns)
+    
+    # Collect result columns, then attach them to the dataframe in one step
+    out = {
+        'claim_validity': VALIDITY_LABELS[validity_code],
+        'coverage_status': COVERAGE_LABELS[coverage_code],
+        'claim_decision': pd.Categorical(DECISION_LABELS[decision_code], categories=[member.label for member in Decision]),
+        'payable_amount': payable,
+        'fraud_risk': FRAUD_RISK_LABELS[fraud_code],
+    }
+    if generate_explanations:
+        out['explanation'] = [
+            build_explanation(facts) for facts in pd.DataFrame({
+                'policy_type': df['policy_type'].astype(str),
+                'loss_type': df['loss_type'].astype(str),
+                'policy_start_date': df['policy_start_date'],
+                'policy_end_date': df['policy_end_date'],
+                'loss_date': df['loss_date'],
+                'deductible': columns[7],
+                'previous_claims': columns[10],
+                'rejection_reason': REJECTION_REASONS[decision_code],
+                **out,
+            }).to_dict('records')
+        ]
+    
+    # Blank flag cells are pd.NA in the string columns, which the Excel export cannot write
+    return df.assign(
+        fir_submitted=df['fir_submitted'].fillna(''),
+        documents_complete=df['documents_complete'].fillna(''),
+        **out,
+    )
+
+
+def process_csv(uploaded_file, chunk_size: int = 5000,
+                progress_callback: Optional[Callable[[int], None]] = None,
+                generate_explanations: bool = True) -> pd.DataFrame:
+    """
+    Process uploaded CSV file and evaluate all claims
+    The file is read and evaluated chunk by chunk; progress_callback, if given,
+    receives the number of rows processed so far after each chunk
+    Without generate_explanations the explanation column is left out
+    """
+    # Read CSV (dates, categories and numbers are converted by the C parser)
+    reader = pd.read_csv(
+        uploaded_file,
+        parse_dates=DATE_COLUMNS,
+        dayfirst=True,
+        date_format='mixed',
+        dtype=CSV_DTYPES,
+        chunksize=chunk_size,
+    )
+    
+    parts = []
+    rows_done = 0
+    with reader:
+        for chunk in reader:
+            parts.append(_evaluate_chunk(chunk, generate_explanations))
+            rows_done += len(chunk)
+            if progress_callback is not None:
+                progress_callback(rows_done)
+    
+    return pd.concat(parts, ignore_index=True)
 
 def dataframe_to_colored_excel(df):
     wb = Workbook()
@@ -365,9 +787,11 @@ def dataframe_to_colored_excel(df):
     # Write header
     ws.append(list(df.columns))
 
-    for row_idx, row in df.iterrows():
-        ws.append(list(row.values))
-        decision = row['claim_decision']
+    # Plain tuples avoid building a pandas Series per row
+    decision_idx = df.columns.get_loc('claim_decision')
+    for row_number, row in enumerate(df.itertuples(index=False, name=None), start=2):
+        ws.append(row)
+        decision = row[decision_idx]
 
         if decision == 'approved':
             fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
@@ -377,7 +801,7 @@ def dataframe_to_colored_excel(df):
             fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
 
         for col in range(1, len(df.columns) + 1):
-            ws.cell(row=ws.max_row, column=col).fill = fill
+            ws.cell(row=row_number, column=col).fill = fill
 
     output = io.BytesIO()
     wb.save(output)
@@ -385,6 +809,37 @@ def dataframe_to_colored_excel(df):
     return output
 
 
+SAMPLE_CLAIMS = {
+    'policy_type': ['comprehensive', 'third_party', 'comprehensive'],
+    'policy_start_date': ['2024-01-01', '2024-02-15', '2023-12-01'],
+    'policy_end_date': ['2025-01-01', '2025-02-15', '2024-12-01'],
+    'loss_date': ['2024-06-15', '2024-07-20', '2024-08-10'],
+    'loss_type': ['accident', 'third_party_damage', 'theft'],
+    'claim_amount': [150000, 80000, 250000],
+    'sum_insured': [500000, 300000, 600000],
+    'deductible': [5000, 3000, 10000],
+    'fir_submitted': ['yes', 'no', 'yes'],
+    'documents_complete': ['yes', 'yes', 'yes'],
+    'previous_claims': [1, 0, 3]
+}
+
+
+def get_expert_system() -> InsuranceExpertSystem:
+    """
+    Expert system instance reused across reruns of the current session
+    The engine keeps per-evaluation state, so it is never shared between sessions
+    """
+    if 'expert_system' not in st.session_state:
+        st.session_state['expert_system'] = InsuranceExpertSystem()
+    return st.session_state['expert_system']
+
+
+@st.cache_data
+def sample_csv_bytes() -> bytes:
+    """Sample CSV template, serialized once"""
+    return pd.DataFrame(SAMPLE_CLAIMS).to_csv(index=False).encode()
+
+
 def main():
     """Streamlit UI for Insurance Expert System"""
     
@@ -448,7 +903,7 @@ def main():
             }
             
             # Run expert system
-            expert_system = InsuranceExpertSystem()
+            expert_system = get_expert_system()
             result = expert_system.evaluate_claim(input_data)
             
             st.markdown("---")
@@ -490,26 +945,9 @@ def main():
         
         # Sample CSV download
         st.markdown("**Step 1:** Download the template CSV")
-        sample_data = {
-            'policy_type': ['comprehensive', 'third_party', 'comprehensive'],
-            'policy_start_date': ['2024-01-01', '2024-02-15', '2023-12-01'],
-            'policy_end_date': ['2025-01-01', '2025-02-15', '2024-12-01'],
-            'loss_date': ['2024-06-15', '2024-07-20', '2024-08-10'],
-            'loss_type': ['accident', 'third_party_damage', 'theft'],
-            'claim_amount': [150000, 80000, 250000],
-            'sum_insured': [500000, 300000, 600000],
-            'deductible': [5000, 3000, 10000],
-            'fir_submitted': ['yes', 'no', 'yes'],
-            'documents_complete': ['yes', 'yes', 'yes'],
-            'previous_claims': [1, 0, 3]
-        }
-        sample_df = pd.DataFrame(sample_data)
-        
-        csv_buffer = io.StringIO()
-        sample_df.to_csv(csv_buffer, index=False)
         st.download_button(
             label="⬇️ Download Sample CSV Template",
-            data=csv_buffer.getvalue(),
+            data=sample_csv_bytes(),
             file_name="insurance_claims_template.csv",
             mime="text/csv"
         )
@@ -518,27 +956,48 @@ def main():
         uploaded_file = st.file_uploader("Choose a CSV file", type=['csv'])
         
         if uploaded_file is not None:
+            generate_explanations = st.checkbox(
+                "Generate explanations", value=True,
+                help="Skipping explanations makes evaluation of large files noticeably faster"
+            )
+            include_explanations = st.checkbox(
+                "Include explanations in the downloaded results", value=False,
+                help="The explanation text is usually the bulk of the file size",
+                disabled=not generate_explanations
+            )
             if st.button("🔍 Evaluate All Claims", type="primary", use_container_width=True):
-                with st.spinner("Processing claims..."):
-                    result_df = process_csv(uploaded_file)
+                # Report progress per chunk; the row total is estimated from the line count
+                total_rows = max(uploaded_file.getvalue().count(b"\n") - 1, 1)
+                progress = st.progress(0.0, text="Processing claims...")
+                result_df = process_csv(
+                    uploaded_file,
+                    progress_callback=lambda rows: progress.progress(min(1.0, rows / total_rows),
+                                                                     text="Processing claims..."),
+                    generate_explanations=generate_explanations
+                )
+                progress.empty()
                 
                 st.success(f"✅ Processed {len(result_df)} claims successfully!")
                 
                 st.subheader("📊 Results Summary")
                 
-                # Summary statistics
+                # Summary statistics (one pass over the decision column)
+                decision_counts = result_df['claim_decision'].value_counts()
+                approved = int(decision_counts.get('approved', 0))
+                rejected = int(decision_counts.get('rejected', 0))
+                investigating = int(decision_counts.get('under_investigation', 0))
+                total_payout = result_df['payable_amount'].sum()
+                # A header-only upload has no claims; report 0% rather than dividing by zero
+                claim_count = max(len(result_df), 1)
+                
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    approved = (result_df['claim_decision'] == 'approved').sum()
-                    st.metric("Approved", approved, delta=f"{approved/len(result_df)*100:.1f}%")
+                    st.metric("Approved", approved, delta=f"{approved/claim_count*100:.1f}%")
                 with col2:
-                    rejected = (result_df['claim_decision'] == 'rejected').sum()
-                    st.metric("Rejected", rejected, delta=f"{rejected/len(result_df)*100:.1f}%")
+                    st.metric("Rejected", rejected, delta=f"{rejected/claim_count*100:.1f}%")
                 with col3:
-                    investigating = (result_df['claim_decision'] == 'under_investigation').sum()
                     st.metric("Under Investigation", investigating)
                 with col4:
-                    total_payout = result_df['payable_amount'].sum()
                     st.metric("Total Payout", f"₹{total_payout:,.0f}")
                 
                 st.markdown("### 🎨 Color Legend")
@@ -550,20 +1009,27 @@ def main():
                 # Display results table
                 st.subheader("📋 Detailed Results")
                 
-                # Color code decision column
-                def highlight_decision(row):
-                    if row['claim_decision'] == 'approved':
-                        return ['background-color: #d4edda; color: black'] * len(row)
-                    elif row['claim_decision'] == 'rejected':
-                        return ['background-color: #f8d7da; color: black'] * len(row)
-                    else:
-                        return ['background-color: #fff3cd; color: black'] * len(row)
-
-                styled_df = result_df.style.apply(highlight_decision, axis=1)
+                # Color code rows by decision (one vectorized pass over the whole frame)
+                def highlight_decisions(frame):
+                    decisions = frame['claim_decision'].to_numpy()
+                    colors = np.where(
+                        decisions == 'approved', 'background-color: #d4edda; color: black',
+                        np.where(decisions == 'rejected', 'background-color: #f8d7da; color: black',
+                                 'background-color: #fff3cd; color: black')
+                    )
+                    return pd.DataFrame(
+                        np.broadcast_to(colors[:, None], frame.shape), index=frame.index, columns=frame.columns
+                    )
+
+                styled_df = result_df.style.apply(highlight_decisions, axis=None)
                 st.dataframe(styled_df, use_container_width=True)
                 
                 # Download processed CSV
-                excel_file = dataframe_to_colored_excel(result_df)
+                if include_explanations and generate_explanations:
+                    export_df = result_df
+                else:
+                    export_df = result_df.drop(columns='explanation', errors='ignore')
+                excel_file = dataframe_to_colored_excel(export_df)
                 st.download_button(
                     label="⬇️ Download Processed Results as Excel",
                     data=excel_file,